@@ -0,0 +1,555 @@
+"""
+Benchmarks for the PDF to webpage converter
+
+Usage:
+    python benchmark.py markdown --lines 200000 --repeat 3
+    python benchmark.py pipeline --documents 8 --pages 20 --workers 4 --ernie-latency 0.5
+    python benchmark.py startup --repeat 10 --budget-ms 80
+    python benchmark.py serve --port 8900   # mock Baidu APIs for manual runs
+
+The pipeline suite generates a synthetic PDF corpus and runs every converter stage
+against a local stand-in for the Baidu OAuth, OCR and ERNIE endpoints, so results
+do not depend on network conditions or API quotas.
+
+Results are printed as JSON so they can be tracked across releases.
+"""
+
+import argparse
+import base64
+import json
+import logging
+import math
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from web_builder import (ERNIE_PATH, OCR_PATH, TOKEN_PATH, BaiduTransport, DiskCache, GenerationCache,
+                         MarkdownRenderer, Metrics, PDFToWebPageConverter, TokenCache)
+
+
+def generate_markdown(lines: int) -> str:
+    """Build a synthetic document mixing every block and inline construct"""
+    section = [
+        "## Section {n}: Transformers & *attention*",
+        "",
+        "Large language models use **self-attention** to weigh `tokens` against each other,",
+        "as described in [the paper](https://arxiv.org/abs/1706.03762 \"Attention\") <b>raw</b>.",
+        "",
+        "- Pre-training on large corpora",
+        "- Fine-tuning with _task-specific_ data",
+        "  - nested detail with snake_case_names",
+        "1. First step",
+        "2. Second step",
+        "",
+        "> Knowledge integration sets ERNIE apart.",
+        "",
+        "```python",
+        "model = load('ernie-4.5')  # <comment>",
+        "```",
+        "",
+    ]
+    out = []
+    n = 0
+    while len(out) < lines:
+        n += 1
+        out.extend(line.format(n=n) for line in section)
+    return '\n'.join(out[:lines])
+
+
+def bench_markdown(lines: int, repeat: int) -> dict:
+    """
+    Time MarkdownRenderer on a synthetic document, and on half of it to check scaling
+
+    Args:
+        lines: Number of Markdown lines in the full document
+        repeat: Runs per size (the best time is reported)
+
+    Returns:
+        Throughput figures for the full and half-size inputs
+    """
+    renderer = MarkdownRenderer()
+    results = {}
+    for label, size in (('half', lines // 2), ('full', lines)):
+        markdown = generate_markdown(size)
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            html = renderer.render(markdown)
+            best = min(best, time.perf_counter() - start)
+        results[label] = {
+            'lines': size,
+            'input_bytes': len(markdown.encode('utf-8')),
+            'output_bytes': len(html.encode('utf-8')),
+            'seconds': round(best, 4),
+            'lines_per_second': round(size / best),
+            'mb_per_second': round(len(markdown.encode('utf-8')) / best / 1e6, 2),
+        }
+    # ~2.0 for a linear-time renderer
+    results['scaling_ratio'] = round(results['full']['seconds'] / results['half']['seconds'], 2)
+    return results
+
+
+class MockBaiduServer:
+    """
+    Local stand-in for the Baidu OAuth, OCR and ERNIE endpoints
+
+    Serves the same paths as the real APIs from a ThreadingHTTPServer on a background
+    thread, with configurable latency per endpoint and random error injection.
+    OCR returns a synthetic layout per uploaded page; ERNIE returns an HTML fragment,
+    as JSON or as a server-sent event stream when the request asks for one.
+    """
+
+    PAGE_OBJECT = re.compile(rb'/Type\s*/Page(?![a-zA-Z])')
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0,
+                 latency: Optional[Dict[str, float]] = None, ocr_page_latency: float = 0.0,
+                 error_rate: float = 0.0, throttle_rate: float = 0.0, seed: int = 0):
+        """
+        Initialize the server (call start() to begin serving)
+
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 picks a free one)
+            latency: Seconds of delay per endpoint ('oauth', 'ocr', 'ernie')
+            ocr_page_latency: Extra OCR delay per uploaded page
+            error_rate: Fraction of requests answered with HTTP 503
+            throttle_rate: Fraction of requests answered with Baidu's QPS error (code 18)
+            seed: Seed for error injection
+        """
+        self.latency = {'oauth': 0.0, 'ocr': 0.0, 'ernie': 0.0, **(latency or {})}
+        self.ocr_page_latency = ocr_page_latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.stats = {endpoint: {'requests': 0, 'errors': 0, 'throttled': 0}
+                      for endpoint in ('oauth', 'ocr', 'ernie')}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._routes = {TOKEN_PATH: 'oauth', OCR_PATH: 'ocr', ERNIE_PATH: 'ernie'}
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'MockBaiduServer':
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> 'MockBaiduServer':
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _inject(self, endpoint: str) -> Optional[str]:
+        """Decide whether this request fails ('error', 'throttled' or None)"""
+        with self._lock:
+            self.stats[endpoint]['requests'] += 1
+            roll = self._random.random()
+            if roll < self.error_rate:
+                self.stats[endpoint]['errors'] += 1
+                return 'error'
+            if roll < self.error_rate + self.throttle_rate:
+                self.stats[endpoint]['throttled'] += 1
+                return 'throttled'
+        return None
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive, like the real endpoints
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                endpoint = server._routes.get(urlparse(self.path).path)
+                body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                if endpoint is None:
+                    return self._send_json(404, {'error_code': 3, 'error_msg': 'Unsupported path'})
+
+                failure = server._inject(endpoint)
+                if failure == 'error':
+                    return self._send_json(503, {'error_msg': 'Injected server error'})
+                if failure == 'throttled':
+                    return self._send_json(200, {'error_code': 18, 'error_msg': 'Open api qps request limit reached'})
+
+                if endpoint == 'oauth':
+                    time.sleep(server.latency['oauth'])
+                    return self._send_json(200, {'access_token': 'mock-token', 'expires_in': 2592000})
+                if endpoint == 'ocr':
+                    return self._ocr(body)
+                return self._ernie(body)
+
+            def _ocr(self, body: bytes):
+                form = parse_qs(body.decode('ascii'))
+                pdf = base64.b64decode(form.get('pdf_file', [''])[0])
+                pages = max(1, len(server.PAGE_OBJECT.findall(pdf)))
+                time.sleep(server.latency['ocr'] + pages * server.ocr_page_latency)
+                layout = []
+                for page in range(pages):
+                    layout.append({'type': 'heading', 'text': f"Scanned Page {page + 1}", 'page': page})
+                    layout.append({'type': 'paragraph', 'page': page,
+                                   'text': "Recognized text from a scanned page of the benchmark corpus."})
+                self._send_json(200, {'layout': layout})
+
+            def _ernie(self, body: bytes):
+                payload = json.loads(body or b'{}')
+                prompt = payload.get('messages', [{}])[-1].get('content', '')
+                time.sleep(server.latency['ernie'])
+                # A fragment proportional to the prompt, like a real conversion
+                words = re.findall(r'\w+', prompt)[-200:]
+                result = f"<section><p>{' '.join(words)}</p></section>"
+                usage = {'total_tokens': (len(prompt) + len(result)) // 4}
+                if not payload.get('stream'):
+                    return self._send_json(200, {'result': result, 'usage': usage})
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                pieces = [result[i:i + 64] for i in range(0, len(result), 64)]
+                for index, piece in enumerate(pieces):
+                    event = {'result': piece, 'is_end': index == len(pieces) - 1}
+                    if event['is_end']:
+                        event['usage'] = usage
+                    data = f"data: {json.dumps(event)}\n\n".encode('utf-8')
+                    self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+                self.wfile.write(b'0\r\n\r\n')
+
+            def _send_json(self, status: int, data: Dict):
+                encoded = json.dumps(data).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(encoded)))
+                self.end_headers()
+                self.wfile.write(encoded)
+
+        return Handler
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def summarize_latencies(seconds: List[float]) -> Dict:
+    """Count, throughput and latency percentiles (ms) for one stage"""
+    if not seconds:
+        return {'count': 0}
+    total = sum(seconds)
+    return {
+        'count': len(seconds),
+        'total_seconds': round(total, 4),
+        'per_second': round(len(seconds) / total, 3) if total > 0 else None,
+        'p50_ms': round(percentile(seconds, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(seconds, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(seconds, 0.99) * 1000, 2),
+        'max_ms': round(max(seconds) * 1000, 2),
+    }
+
+
+def max_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process (None where unsupported)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def bench_pipeline(documents: int, pages: int, workers: int = 1,
+                   latency: Optional[Dict[str, float]] = None, ocr_page_latency: float = 0.0,
+                   error_rate: float = 0.0, throttle_rate: float = 0.0,
+                   force_ocr: bool = False, ocr_pages_per_request: Optional[int] = None,
+                   ernie_chunk_chars: Optional[int] = 6000, stream: bool = False,
+                   trace_memory: bool = False, verbose: bool = False) -> Dict:
+    """
+    Run every converter stage over a synthetic corpus against MockBaiduServer
+
+    Caches and incremental reuse are disabled so each run measures real work.
+
+    Args:
+        documents: Number of PDFs in the corpus
+        pages: Pages per PDF
+        workers: Documents converted concurrently
+        latency: Mock latency per endpoint in seconds ('oauth', 'ocr', 'ernie')
+        ocr_page_latency: Extra mock OCR latency per page
+        error_rate: Fraction of mock responses that are HTTP 503
+        throttle_rate: Fraction of mock responses that are QPS-limit errors
+        force_ocr: Send every page to OCR instead of reading the text layer
+        ocr_pages_per_request: Page-range size for concurrent OCR
+        ernie_chunk_chars: Section size for chunked ERNIE generation (None disables)
+        stream: Use server-sent-event streaming for ERNIE
+        trace_memory: Record the Python heap peak with tracemalloc (slows the run)
+        verbose: Show converter log output
+
+    Returns:
+        Per-stage throughput and latency figures, wall-clock totals, peak memory,
+        mock server request counts and the converter's own metrics
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from create_sample_pdf import create_corpus
+
+    stages = ('extract', 'markdown', 'webpage')
+    timings: Dict[str, List[float]] = {stage: [] for stage in stages}
+    failures = []
+    timings_lock = threading.Lock()
+
+    with tempfile.TemporaryDirectory(prefix='ernie-bench-') as workdir:
+        workdir = Path(workdir)
+        corpus = create_corpus(str(workdir / 'corpus'), documents, pages=pages)
+
+        with MockBaiduServer(latency=latency, ocr_page_latency=ocr_page_latency,
+                             error_rate=error_rate, throttle_rate=throttle_rate) as server:
+            # No client-side rate limits: measure the pipeline, not the quotas
+            unlimited = {'initial_concurrency': 256, 'max_concurrency': 256}
+            metrics = Metrics()
+            converter = PDFToWebPageConverter(
+                output_dir=str(workdir / 'output'),
+                api_key='benchmark-key', api_secret='benchmark-secret',
+                api_base=server.url,
+                transport=BaiduTransport(pool_size=4 * workers, backoff_base=0.05, backoff_max=0.5,
+                                         rate_limits={endpoint: unlimited
+                                                      for endpoint in ('oauth', 'ocr', 'ernie')},
+                                         metrics=metrics),
+                token_cache=TokenCache(str(workdir / 'token.json')),
+                ocr_cache=DiskCache(str(workdir / 'ocr')), use_ocr_cache=False,
+                generation_cache=GenerationCache(DiskCache(str(workdir / 'ernie'))),
+                use_generation_cache=False, incremental=False,
+                use_text_layer=not force_ocr, ocr_pages_per_request=ocr_pages_per_request,
+                ernie_chunk_chars=ernie_chunk_chars, stream_ernie=stream, metrics=metrics)
+
+            def convert(index: int, pdf_path: str) -> None:
+                output_dir = workdir / 'output' / f"doc-{index:03d}"
+                output_dir.mkdir(parents=True, exist_ok=True)
+                spent = {}
+                try:
+                    start = time.perf_counter()
+                    data = converter.extract_text_from_pdf_with_paddleocr(pdf_path)
+                    spent['extract'] = time.perf_counter() - start
+
+                    start = time.perf_counter()
+                    markdown = converter.convert_to_markdown(data, output_dir)
+                    spent['markdown'] = time.perf_counter() - start
+
+                    start = time.perf_counter()
+                    converter.build_webpage(markdown, output_dir)
+                    spent['webpage'] = time.perf_counter() - start
+                except Exception as e:
+                    with timings_lock:
+                        failures.append(f"{Path(pdf_path).name}: {type(e).__name__}: {e}")
+                with timings_lock:
+                    for stage, seconds in spent.items():
+                        timings[stage].append(seconds)
+
+            if trace_memory:
+                import tracemalloc
+                tracemalloc.start()
+            logging.getLogger('warmup').setLevel(logging.INFO if verbose else logging.CRITICAL)
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+                list(pool.map(convert, range(len(corpus)), corpus))
+            wall = time.perf_counter() - start
+            python_peak = None
+            if trace_memory:
+                python_peak = round(tracemalloc.get_traced_memory()[1] / 1e6, 1)
+                tracemalloc.stop()
+            mock_stats = server.stats
+
+    report = {
+        'config': {
+            'documents': documents, 'pages': pages, 'workers': workers,
+            'latency': latency or {}, 'ocr_page_latency': ocr_page_latency,
+            'error_rate': error_rate, 'throttle_rate': throttle_rate,
+            'force_ocr': force_ocr, 'ocr_pages_per_request': ocr_pages_per_request,
+            'ernie_chunk_chars': ernie_chunk_chars, 'stream': stream,
+        },
+        'stages': {stage: summarize_latencies(timings[stage]) for stage in stages},
+        'wall_seconds': round(wall, 4),
+        'documents_per_second': round(documents / wall, 3) if wall > 0 else None,
+        'pages_per_second': round(documents * pages / wall, 3) if wall > 0 else None,
+        'failures': failures,
+        'memory': {'max_rss_mb': max_rss_mb(), 'python_peak_mb': python_peak},
+        'mock_server': mock_stats,
+        'metrics': metrics.snapshot(),
+    }
+    return report
+
+
+# Modules a template-only run should never load
+STARTUP_HEAVY_MODULES = ('requests', 'urllib3', 'asyncio', 'pdfplumber', 'PyPDF2')
+
+
+def bench_startup(repeat: int = 10, budget_ms: Optional[float] = None) -> Dict:
+    """
+    Time cold starts of an offline, template-only CLI conversion in fresh interpreters
+
+    Each run is a new process, so the figures include interpreter start-up, imports and
+    argument parsing. The time of a bare interpreter is measured alongside and
+    subtracted, which keeps the budget independent of the machine's site packages.
+
+    Args:
+        repeat: Runs per command (medians are reported)
+        budget_ms: Maximum allowed median overhead of the CLI over a bare interpreter
+
+    Returns:
+        Median timings, the heavy modules that were imported and the budget verdict
+    """
+    import subprocess
+
+    root = Path(__file__).resolve().parent
+    with tempfile.TemporaryDirectory(prefix='ernie-startup-') as workdir:
+        env = {key: value for key, value in os.environ.items() if not key.startswith('BAIDU_')}
+        env['ERNIE_CACHE_DIR'] = os.path.join(workdir, 'cache')
+        env.pop('PYTHONDONTWRITEBYTECODE', None)  # measure with the bytecode cache users get
+        cli = ['warmup.py', '--offline', '--output', os.path.join(workdir, 'output'), '--log-level', 'ERROR']
+        commands = {
+            'interpreter': ['-c', 'pass'],
+            'import': ['-c', 'import warmup'],
+            'cli_offline': cli,
+        }
+
+        def run(args: List[str]) -> subprocess.CompletedProcess:
+            return subprocess.run([sys.executable, *args], cwd=root, env=env, check=True,
+                                  stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+
+        run(cli)  # compile bytecode and create the output directory outside the timed runs
+        timings: Dict[str, List[float]] = {name: [] for name in commands}
+        for _ in range(repeat):
+            # Interleaved, so background noise affects every command alike
+            for name, args in commands.items():
+                start = time.perf_counter()
+                run(args)
+                timings[name].append(time.perf_counter() - start)
+
+        probe = ("import json, sys, warmup\n"
+                 f"sys.argv = {cli!r}\n"
+                 "warmup.main()\n"
+                 f"print(json.dumps([m for m in {STARTUP_HEAVY_MODULES!r} if m in sys.modules]))")
+        loaded = json.loads(run(['-c', probe]).stdout.strip().splitlines()[-1])
+
+    medians = {name: round(percentile(values, 0.5) * 1000, 1) for name, values in timings.items()}
+    overhead = round(medians['cli_offline'] - medians['interpreter'], 1)
+    report = {
+        'runs': repeat,
+        'median_ms': medians,
+        'import_overhead_ms': round(medians['import'] - medians['interpreter'], 1),
+        'cli_overhead_ms': overhead,
+        'heavy_modules_loaded': loaded,
+    }
+    if budget_ms is not None:
+        report['budget_ms'] = budget_ms
+        report['within_budget'] = overhead <= budget_ms and not loaded
+    return report
+
+
+def serve_mock(host: str, port: int, latency: Dict[str, float], error_rate: float,
+               throttle_rate: float) -> None:
+    """Run MockBaiduServer in the foreground until interrupted"""
+    server = MockBaiduServer(host, port, latency=latency, error_rate=error_rate,
+                             throttle_rate=throttle_rate)
+    print(f"Mock Baidu APIs on {server.url}", file=sys.stderr)
+    print(f"  export BAIDU_API_BASE={server.url} BAIDU_API_KEY=mock BAIDU_API_SECRET=mock",
+          file=sys.stderr)
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+def _add_mock_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--oauth-latency', type=float, default=0.0, help="Mock OAuth latency (s)")
+    parser.add_argument('--ocr-latency', type=float, default=0.05, help="Mock OCR latency per request (s)")
+    parser.add_argument('--ernie-latency', type=float, default=0.1, help="Mock ERNIE latency (s)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of HTTP 503 responses")
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help="Fraction of QPS-limit errors")
+
+
+def _latency(args: argparse.Namespace) -> Dict[str, float]:
+    return {'oauth': args.oauth_latency, 'ocr': args.ocr_latency, 'ernie': args.ernie_latency}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Converter benchmarks")
+    subparsers = parser.add_subparsers(dest='suite', required=True)
+
+    markdown_parser = subparsers.add_parser('markdown', help="Markdown to HTML rendering throughput")
+    markdown_parser.add_argument('--lines', type=int, default=200000)
+    markdown_parser.add_argument('--repeat', type=int, default=3)
+
+    pipeline_parser = subparsers.add_parser('pipeline', help="End-to-end stages against a mock Baidu server")
+    pipeline_parser.add_argument('--documents', type=int, default=4)
+    pipeline_parser.add_argument('--pages', type=int, default=10)
+    pipeline_parser.add_argument('--workers', type=int, default=1)
+    _add_mock_arguments(pipeline_parser)
+    pipeline_parser.add_argument('--ocr-page-latency', type=float, default=0.0,
+                                 help="Extra mock OCR latency per page (s)")
+    pipeline_parser.add_argument('--force-ocr', action='store_true',
+                                 help="OCR every page instead of reading the text layer")
+    pipeline_parser.add_argument('--ocr-pages-per-request', type=int, default=None)
+    pipeline_parser.add_argument('--ernie-chunk-chars', type=int, default=6000)
+    pipeline_parser.add_argument('--stream', action='store_true')
+    pipeline_parser.add_argument('--trace-memory', action='store_true',
+                                 help="Report the Python heap peak (slower)")
+    pipeline_parser.add_argument('--verbose', action='store_true',
+                                 help="Show converter output on stderr")
+
+    startup_parser = subparsers.add_parser('startup', help="Cold start of an offline template-only conversion")
+    startup_parser.add_argument('--repeat', type=int, default=10)
+    startup_parser.add_argument('--budget-ms', type=float, default=None,
+                                help="Fail if the median CLI overhead over a bare interpreter exceeds this")
+
+    serve_parser = subparsers.add_parser('serve', help="Run the mock Baidu server in the foreground")
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8900)
+    _add_mock_arguments(serve_parser)
+
+    args = parser.parse_args()
+    logging.basicConfig(format='%(message)s')
+    if args.suite == 'serve':
+        serve_mock(args.host, args.port, _latency(args), args.error_rate, args.throttle_rate)
+        return
+    if args.suite == 'markdown':
+        report = {'markdown': bench_markdown(args.lines, args.repeat)}
+    elif args.suite == 'pipeline':
+        report = {'pipeline': bench_pipeline(
+            args.documents, args.pages, workers=args.workers, latency=_latency(args),
+            ocr_page_latency=args.ocr_page_latency, error_rate=args.error_rate,
+            throttle_rate=args.throttle_rate, force_ocr=args.force_ocr,
+            ocr_pages_per_request=args.ocr_pages_per_request,
+            ernie_chunk_chars=args.ernie_chunk_chars or None, stream=args.stream,
+            trace_memory=args.trace_memory, verbose=args.verbose)}
+    elif args.suite == 'startup':
+        report = {'startup': bench_startup(args.repeat, budget_ms=args.budget_ms)}
+
+    json.dump(report, sys.stdout, indent=2)
+    print()
+    if report.get('startup', {}).get('within_budget') is False:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -8,22 +8,28 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
 from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
+import os
+import random
 
-def create_ai_language_models_pdf(filename="sample_ai_document.pdf"):
-    """Create a sample PDF about AI and Language Models"""
-
-    # Create the PDF
+def _document(filename):
+    """Page template and styles shared by the generated PDFs"""
     doc = SimpleDocTemplate(filename, pagesize=letter,
                           rightMargin=72, leftMargin=72,
                           topMargin=72, bottomMargin=18)
 
-    # Container for the 'Flowable' objects
-    elements = []
-
-    # Define styles
     styles = getSampleStyleSheet()
     styles.add(ParagraphStyle(name='Center', alignment=TA_CENTER))
     styles.add(ParagraphStyle(name='Justify', alignment=TA_JUSTIFY))
+    return doc, styles
+
+def create_ai_language_models_pdf(filename="sample_ai_document.pdf"):
+    """Create a sample PDF about AI and Language Models"""
+
+    # Create the PDF
+    doc, styles = _document(filename)
+
+    # Container for the 'Flowable' objects
+    elements = []
 
     # Title
     title = Paragraph("<b>The Evolution of Large Language Models:<br/>From Transformers to ERNIE</b>",
@@ -318,5 +324,78 @@ def create_ai_language_models_pdf(filename="sample_ai_document.pdf"):
     print(f"✅ PDF created successfully: {filename}")
     return filename
 
+# Vocabulary for synthetic benchmark documents
+SYNTHETIC_TOPICS = [
+    "Transformer Architectures", "Knowledge Integration", "Document Understanding",
+    "Optical Character Recognition", "Fine-tuning Strategies", "Multimodal Models",
+    "Retrieval Augmentation", "Edge Deployment", "Evaluation Benchmarks", "Tokenization",
+]
+SYNTHETIC_SENTENCES = [
+    "Large language models learn general representations from web-scale corpora.",
+    "Self-attention lets every token weigh the relevance of every other token.",
+    "ERNIE incorporates structured knowledge from knowledge graphs during pre-training.",
+    "PaddleOCR-VL combines visual understanding with language processing.",
+    "Parameter-efficient methods such as LoRA adapt large models with little compute.",
+    "Layout analysis recovers headings, paragraphs, tables and lists from page images.",
+    "Quantization and distillation make deployment on edge devices practical.",
+    "Benchmarks should cover accuracy, latency and cost across realistic workloads.",
+    "Retrieval grounds generated answers in up-to-date external documents.",
+    "Multimodal pre-training aligns text and image representations in one space.",
+]
+
+def create_synthetic_pdf(filename, pages=10, sections_per_page=2, paragraphs_per_section=2,
+                         list_items=3, seed=0):
+    """
+    Create a PDF of configurable size for benchmarks
+
+    Args:
+        filename: Output path
+        pages: Number of pages (each starts on a new page)
+        sections_per_page: Heading-delimited sections per page
+        paragraphs_per_section: Paragraphs under each section heading
+        list_items: Bullet points at the end of each section (0 for none)
+        seed: Seed for the text generator; equal arguments produce identical content
+    """
+    rng = random.Random(seed)
+    doc, styles = _document(filename)
+    elements = [Paragraph(f"<b>Synthetic Benchmark Document {seed}</b>", styles['Title']),
+                Spacer(1, 12)]
+
+    section = 0
+    for page in range(pages):
+        if page:
+            elements.append(PageBreak())
+        for _ in range(sections_per_page):
+            section += 1
+            elements.append(Paragraph(f"<b>{section}. {rng.choice(SYNTHETIC_TOPICS)}</b>",
+                                      styles['Heading2']))
+            elements.append(Spacer(1, 12))
+            for _ in range(paragraphs_per_section):
+                text = " ".join(rng.choice(SYNTHETIC_SENTENCES) for _ in range(rng.randint(3, 6)))
+                elements.append(Paragraph(text, styles['Justify']))
+                elements.append(Spacer(1, 12))
+            for _ in range(list_items):
+                elements.append(Paragraph(f"• {rng.choice(SYNTHETIC_SENTENCES)}", styles['Normal']))
+                elements.append(Spacer(1, 8))
+
+    doc.build(elements)
+    return filename
+
+def create_corpus(directory, documents=4, **options):
+    """
+    Create a directory of synthetic PDFs (doc-000.pdf, doc-001.pdf, ...)
+
+    Args:
+        directory: Output directory (created if missing)
+        documents: Number of PDFs
+        **options: create_synthetic_pdf arguments shared by every document
+
+    Returns:
+        List of the generated file paths
+    """
+    os.makedirs(directory, exist_ok=True)
+    return [create_synthetic_pdf(os.path.join(directory, f"doc-{index:03d}.pdf"), seed=index, **options)
+            for index in range(documents)]
+
 if __name__ == "__main__":
     create_ai_language_models_pdf()
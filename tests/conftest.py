@@ -0,0 +1,13 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# The modules under test are top-level scripts in the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Keep default caches (tokens, OCR, ERNIE) out of the user's cache directory
+os.environ['ERNIE_CACHE_DIR'] = tempfile.mkdtemp(prefix='ernie-tests-')
+os.environ.pop('BAIDU_API_KEY', None)
+os.environ.pop('BAIDU_API_SECRET', None)
+os.environ.pop('BAIDU_API_BASE', None)
@@ -0,0 +1,52 @@
+"""Batch conversion of many PDFs"""
+
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+from web_builder import collect_pdf_paths, process_batch
+
+SAMPLE_PDF = Path(__file__).resolve().parent.parent / 'sample_ai_document.pdf'
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    root = tmp_path / 'in'
+    (root / 'nested').mkdir(parents=True)
+    for path in (root / 'a.pdf', root / 'nested' / 'a.pdf', root / 'b.pdf'):
+        shutil.copy(SAMPLE_PDF, path)
+    (root / 'broken.pdf').write_bytes(b'%PDF-1.4 broken')
+    (root / 'notes.txt').write_text('not a pdf', encoding='utf-8')
+    return root
+
+
+def test_inputs_are_expanded_and_deduplicated(inputs):
+    paths = collect_pdf_paths([str(inputs), str(inputs / 'a.pdf'), str(inputs / 'nested' / '*.pdf'),
+                               str(inputs / 'missing.pdf')])
+
+    assert [path.relative_to(inputs).as_posix() for path in paths] == ['a.pdf', 'b.pdf', 'broken.pdf',
+                                                                       'nested/a.pdf']
+
+
+@pytest.mark.parametrize('executor', ['thread', 'process', 'async'])
+def test_batch_converts_every_document(tmp_path, inputs, executor):
+    pytest.importorskip('pdfplumber')
+    output = tmp_path / 'site'
+
+    summary = process_batch([str(inputs)], output_root=str(output), workers=2, executor=executor,
+                            converter_options={'offline': True, 'demo_fallback': False}, site=True)
+
+    statuses = {Path(result['pdf']).relative_to(inputs).as_posix(): result['status']
+                for result in summary['results']}
+    assert statuses == {'a.pdf': 'ok', 'nested/a.pdf': 'ok', 'b.pdf': 'ok', 'broken.pdf': 'failed'}
+    assert (summary['documents'], summary['succeeded'], summary['failed']) == (4, 3, 1)
+    assert sorted(path.parent.name for path in output.glob('*/index.html')) == ['a', 'a-2', 'b']
+    assert '3 documents' in (output / 'index.html').read_text(encoding='utf-8')
+    assert json.loads((output / 'batch_summary.json').read_text(encoding='utf-8'))['failed'] == 1
+
+
+def test_unknown_executor_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        process_batch([], output_root=str(tmp_path), executor='fiber')
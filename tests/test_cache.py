@@ -0,0 +1,173 @@
+"""Access-token, OCR and generation caches"""
+
+import os
+import threading
+from pathlib import Path
+
+import pytest
+
+from web_builder import DiskCache, GenerationCache, PDFToWebPageConverter, TokenCache
+
+SAMPLE_PDF = Path(__file__).resolve().parent.parent / 'sample_ai_document.pdf'
+
+
+def token_fetcher(tokens, expires_in=3600):
+    calls = []
+
+    def fetch():
+        calls.append(None)
+        return {'access_token': f"{tokens}-{len(calls)}", 'expires_in': expires_in}
+
+    return fetch, calls
+
+
+def test_token_is_fetched_once_and_shared_through_the_file(tmp_path):
+    fetch, calls = token_fetcher('token')
+
+    assert TokenCache(tmp_path / 'token.json').get('key', fetch) == 'token-1'
+    assert TokenCache(tmp_path / 'token.json').get('key', fetch) == 'token-1'
+    assert len(calls) == 1
+    assert 'key' not in (tmp_path / 'token.json').read_text()
+
+
+def test_concurrent_refresh_is_single_flight(tmp_path):
+    fetch, calls = token_fetcher('token')
+    cache = TokenCache(tmp_path / 'token.json')
+    start = threading.Barrier(8)
+    tokens = []
+
+    def get():
+        start.wait()
+        tokens.append(cache.get('key', fetch))
+
+    threads = [threading.Thread(target=get) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert tokens == ['token-1'] * 8
+    assert len(calls) == 1
+
+
+def test_token_is_refreshed_before_it_expires(tmp_path):
+    fetch, calls = token_fetcher('token', expires_in=600)
+    cache = TokenCache(tmp_path / 'token.json', min_refresh_margin=300)
+
+    assert cache.get('key', fetch) == 'token-1'
+    assert cache.get('key', fetch) == 'token-1'
+
+    cache = TokenCache(tmp_path / 'token.json', min_refresh_margin=900)
+    assert cache.get('key', fetch) == 'token-2'
+
+
+def test_failed_refresh_falls_back_to_the_unexpired_token(tmp_path):
+    fetch, _ = token_fetcher('token', expires_in=600)
+    TokenCache(tmp_path / 'token.json').get('key', fetch)
+    cache = TokenCache(tmp_path / 'token.json', min_refresh_margin=900)
+    calls = []
+
+    def failing():
+        calls.append(None)
+        raise ConnectionError('down')
+
+    assert cache.get('key', failing) == 'token-1'
+    assert cache.get('key', failing) == 'token-1'
+    assert len(calls) == 1  # backing off
+
+    with pytest.raises(ConnectionError):
+        TokenCache(tmp_path / 'other.json').get('key', failing)
+
+
+def test_disk_cache_round_trip_and_age(tmp_path):
+    cache = DiskCache(tmp_path / 'cache')
+    cache.put('ab' * 32, {'layout': ['ü']})
+
+    assert cache.get('ab' * 32) == {'layout': ['ü']}
+    assert cache.get('ab' * 32, max_age=-1) is None
+    assert cache.get('cd' * 32) is None
+
+    cache.delete('ab' * 32)
+    assert cache.get('ab' * 32) is None
+
+
+def test_disk_cache_ignores_corrupt_entries(tmp_path):
+    cache = DiskCache(tmp_path / 'cache')
+    cache.put('ab' * 32, 'value')
+    cache._path('ab' * 32).write_text('{"created": 1', encoding='utf-8')
+
+    assert cache.get('ab' * 32) is None
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    cache = DiskCache(tmp_path / 'cache', max_bytes=10 ** 6)
+    keys = [f"{index:02x}" * 32 for index in range(4)]
+    for age, key in enumerate(keys):
+        cache.put(key, 'x' * 1000)
+        os.utime(cache._path(key), (1000 + age, 1000 + age))
+    cache.get(keys[0])  # most recently used now
+
+    cache.max_bytes = int(3.5 * cache._path(keys[0]).stat().st_size)
+    cache.put('ff' * 32, 'x' * 1000)
+
+    assert [cache.get(key) is not None for key in keys] == [True, False, False, True]
+    assert cache.get('ff' * 32) is not None
+
+
+def test_identical_pdfs_are_recognized_once(tmp_path):
+    from benchmark import MockBaiduServer
+
+    pdf_path = tmp_path / 'scan.pdf'
+    pdf_path.write_bytes(SAMPLE_PDF.read_bytes())
+    with MockBaiduServer() as server:
+        for index in range(2):
+            converter = PDFToWebPageConverter(output_dir=str(tmp_path / 'output'), api_key='key',
+                                              api_secret='secret', api_base=server.url, use_text_layer=False,
+                                              token_cache=TokenCache(tmp_path / 'token.json'),
+                                              ocr_cache=DiskCache(tmp_path / 'ocr'))
+            result = converter.extract_text_from_pdf_with_paddleocr(str(pdf_path))
+            assert result['layout'][0]['text'] == 'Scanned Page 1'
+
+    assert server.stats['ocr']['requests'] == 1
+
+
+def test_generation_key_depends_on_model_prompt_and_sampling():
+    key = GenerationCache.make_key('model', 'prompt', {'temperature': 0.7, 'top_p': 0.9})
+
+    assert key == GenerationCache.make_key('model', 'prompt', {'top_p': 0.9, 'temperature': 0.7})
+    assert key != GenerationCache.make_key('other', 'prompt', {'temperature': 0.7, 'top_p': 0.9})
+    assert key != GenerationCache.make_key('model', 'prompt.', {'temperature': 0.7, 'top_p': 0.9})
+    assert key != GenerationCache.make_key('model', 'prompt', {'temperature': 0.8, 'top_p': 0.9})
+
+
+def test_generation_cache_keeps_recent_responses_in_memory(tmp_path):
+    cache = GenerationCache(DiskCache(tmp_path / 'ernie'), max_entries=2)
+    for key in ('a' * 64, 'b' * 64, 'c' * 64):
+        cache.put(key, key[0])
+
+    assert list(cache._memory) == ['b' * 64, 'c' * 64]
+    assert cache.get('a' * 64) == 'a'  # promoted from disk
+    assert list(cache._memory) == ['c' * 64, 'a' * 64]
+
+
+def test_generation_cache_expires_responses(tmp_path):
+    cache = GenerationCache(DiskCache(tmp_path / 'ernie'), ttl=-1)
+    cache.put('a' * 64, 'a')
+
+    assert cache.get('a' * 64) is None
+
+
+def test_repeated_generation_is_served_from_the_cache(tmp_path):
+    from benchmark import MockBaiduServer
+
+    with MockBaiduServer() as server:
+        pages = []
+        for _ in range(2):
+            converter = PDFToWebPageConverter(output_dir=str(tmp_path / 'output'), api_key='key',
+                                              api_secret='secret', api_base=server.url,
+                                              token_cache=TokenCache(tmp_path / 'token.json'),
+                                              generation_cache=GenerationCache(DiskCache(tmp_path / 'ernie')))
+            pages.append(converter.generate_webpage_with_ernie('# Title\n\nSome text.\n'))
+
+    assert server.stats['ernie']['requests'] == 1
+    assert pages[0] == pages[1]
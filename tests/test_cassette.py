@@ -0,0 +1,67 @@
+"""Record/replay transport for offline runs"""
+
+import shutil
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('requests')
+
+from benchmark import MockBaiduServer
+from web_builder import CassetteMiss, CassetteTransport, PDFToWebPageConverter, TokenCache
+
+SAMPLE_PDF = Path(__file__).resolve().parent.parent / 'sample_ai_document.pdf'
+
+
+def convert(tmp_path, name, transport, api_base, api_key='key'):
+    converter = PDFToWebPageConverter(output_dir=str(tmp_path / name), api_key=api_key, api_secret='secret',
+                                      api_base=api_base, transport=transport, use_text_layer=False,
+                                      use_ocr_cache=False, use_generation_cache=False, incremental=False,
+                                      token_cache=TokenCache(tmp_path / f"{name}-token.json"))
+    data = converter.extract_text_from_pdf_with_paddleocr(str(tmp_path / 'scan.pdf'))
+    markdown = converter.convert_to_markdown(data)
+    return converter.build_webpage(markdown).read_text(encoding='utf-8')
+
+
+@pytest.fixture
+def pdf(tmp_path):
+    shutil.copy(SAMPLE_PDF, tmp_path / 'scan.pdf')
+
+
+def test_replay_reproduces_a_recorded_run_without_network(tmp_path, pdf):
+    cassette = tmp_path / 'cassette'
+    with MockBaiduServer() as server:
+        recorded = convert(tmp_path, 'recorded', CassetteTransport(str(cassette), mode='record'), server.url)
+    requests_made = {endpoint: stats['requests'] for endpoint, stats in server.stats.items()}
+
+    # Another key and an unreachable host: replay needs neither credentials nor network
+    replayed = convert(tmp_path, 'replayed', CassetteTransport(str(cassette)), 'http://127.0.0.1:9',
+                       api_key='other')
+
+    assert requests_made == {'oauth': 1, 'ocr': 1, 'ernie': 1}
+    assert replayed == recorded
+    assert 'Scanned Page 1' in replayed
+
+
+def test_secrets_are_not_recorded(tmp_path, pdf):
+    cassette = tmp_path / 'cassette'
+    with MockBaiduServer() as server:
+        convert(tmp_path, 'recorded', CassetteTransport(str(cassette), mode='record'), server.url,
+                api_key='very-secret-key')
+
+    recordings = ''.join(path.read_text(encoding='utf-8') for path in cassette.rglob('*.json'))
+    assert 'very-secret-key' not in recordings
+    assert 'mock-token' not in recordings
+    assert len(list(cassette.rglob('*.json'))) == 3
+
+
+def test_unrecorded_requests_fail_in_replay(tmp_path):
+    transport = CassetteTransport(str(tmp_path / 'empty'))
+
+    with pytest.raises(CassetteMiss):
+        transport.post('http://127.0.0.1:9/rest/2.0/ocr/v1/doc_analysis', endpoint='ocr', data={'pdf_file': ''})
+
+
+def test_unknown_mode_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        CassetteTransport(str(tmp_path), mode='rewind')
@@ -0,0 +1,86 @@
+"""Section-by-section generation of large documents"""
+
+import re
+
+import pytest
+
+from web_builder import (ERNIE_MODEL, ERNIE_SAMPLING, DiskCache, GenerationCache, MarkdownRenderer,
+                         PDFToWebPageConverter, split_markdown_sections)
+
+CODE = '\n'.join(f"line {index} = {'x' * 40}" for index in range(150))
+ITEMS = '\n'.join(f"- item {index} text" for index in range(200))
+LARGE = (f"# Title\n\nIntro paragraph.\n\n## Code\n\n```python\n{CODE}\n```\n\n"
+         f"## List\n\n{ITEMS}\n\n## End\n\nDone.\n")
+
+
+@pytest.fixture
+def converter(tmp_path):
+    return PDFToWebPageConverter(output_dir=str(tmp_path / 'output'), offline=True,
+                                 generation_cache=GenerationCache(DiskCache(tmp_path / 'ernie')))
+
+
+def test_split_restores_input():
+    pieces = split_markdown_sections(LARGE, 6000)
+
+    assert len(pieces) > 1
+    assert '\n'.join(pieces) == LARGE
+
+
+def test_split_keeps_fences_and_lists_whole():
+    for piece in split_markdown_sections(LARGE, 1000):
+        html = MarkdownRenderer().render(piece)
+        assert piece.count('```') in (0, 2)
+        assert html.count('<ul>') <= 1
+        assert '<p>```' not in html
+
+    pieces = split_markdown_sections(LARGE, 1000)
+    assert sum('- item 0 text' in piece and '- item 199 text' in piece for piece in pieces) == 1
+
+
+def test_split_list_with_blank_lines_between_items():
+    markdown = '\n\n'.join(f"- item {index}" for index in range(50))
+
+    assert split_markdown_sections(markdown, 100) == [markdown]
+
+
+def test_split_long_paragraphs_at_blank_lines():
+    paragraphs = [f"Paragraph {index} " + 'word ' * 30 for index in range(6)]
+
+    pieces = split_markdown_sections('\n\n'.join(paragraphs), 400)
+
+    assert all(len(piece) <= 400 for piece in pieces)
+    assert len(pieces) > 1
+
+
+def test_template_page_is_rendered_in_one_pass_without_ernie(converter):
+    assert not converter._use_chunking(LARGE)
+
+    page = converter.generate_webpage_with_ernie(LARGE)
+
+    assert len(re.findall('<pre>', page)) == 1
+    assert len(re.findall('<ul>', page)) == 1
+    assert '<p>```' not in page
+
+
+def test_cached_sections_enable_chunking_without_a_token(converter):
+    assert not converter._use_chunking(LARGE)
+    section = split_markdown_sections(LARGE, converter.ernie_chunk_chars)[0]
+    key = GenerationCache.make_key(ERNIE_MODEL, converter._build_section_prompt(section), ERNIE_SAMPLING)
+    converter.generation_cache.put(key, '<h1>Title</h1>')
+
+    assert converter._use_chunking(LARGE)
+
+
+def test_sections_are_generated_when_a_token_is_available(tmp_path):
+    from benchmark import MockBaiduServer
+    from web_builder import TokenCache
+
+    with MockBaiduServer() as server:
+        converter = PDFToWebPageConverter(output_dir=str(tmp_path / 'output'), api_key='key', api_secret='secret',
+                                          api_base=server.url, token_cache=TokenCache(tmp_path / 'token.json'),
+                                          generation_cache=GenerationCache(DiskCache(tmp_path / 'ernie')))
+        assert converter._use_chunking(LARGE)
+        page = converter.generate_webpage_with_ernie(LARGE)
+
+    assert server.stats['ernie']['requests'] == len(split_markdown_sections(LARGE, converter.ernie_chunk_chars))
+    assert page.startswith('<!DOCTYPE html>')
@@ -0,0 +1,58 @@
+"""Incremental rebuilds from the build manifest"""
+
+import pytest
+
+from web_builder import BuildManifest, PDFToWebPageConverter, TokenCache
+
+SECTIONS = [f"## Section {index}\n\n" + f"Text of section {index}. " * 8 + '\n' for index in range(4)]
+
+
+def test_manifest_keeps_only_the_sections_of_the_last_build(tmp_path):
+    first = BuildManifest(tmp_path)
+    first.put('a', '<p>a</p>')
+    first.put('b', '<p>b</p>')
+    first.save()
+
+    second = BuildManifest(tmp_path)
+    assert second.get('a') == '<p>a</p>' and second.reused == 1
+    second.put('c', '<p>c</p>')
+    second.save()
+
+    third = BuildManifest(tmp_path)
+    assert third.get('b') is None
+    assert third.get('c') == '<p>c</p>'
+    assert BuildManifest(tmp_path, reuse=False).get('c') is None
+
+
+def test_manifest_is_not_written_for_template_builds(tmp_path):
+    BuildManifest(tmp_path).save()
+
+    assert not (tmp_path / BuildManifest.FILENAME).exists()
+
+
+def test_unreadable_manifest_is_ignored(tmp_path):
+    (tmp_path / BuildManifest.FILENAME).write_text('{"version": 1, "sect', encoding='utf-8')
+
+    assert BuildManifest(tmp_path).previous == {}
+
+
+def test_rebuild_generates_only_changed_sections(tmp_path):
+    pytest.importorskip('requests')
+    from benchmark import MockBaiduServer
+
+    output = tmp_path / 'doc'
+    with MockBaiduServer() as server:
+        converter = PDFToWebPageConverter(output_dir=str(output), api_key='key', api_secret='secret',
+                                          api_base=server.url, use_generation_cache=False,
+                                          token_cache=TokenCache(tmp_path / 'token.json'), ernie_chunk_chars=300)
+        converter.build_webpage(''.join(SECTIONS), output)
+        first = server.stats['ernie']['requests']
+        converter.build_webpage(''.join(SECTIONS), output)
+        unchanged = server.stats['ernie']['requests'] - first
+        converter.build_webpage(''.join(SECTIONS[:2] + ['## Section 2\n\nNew text.\n'] + SECTIONS[3:]), output)
+        changed = server.stats['ernie']['requests'] - first
+
+    assert first == len(SECTIONS)
+    assert unchanged == 0
+    assert changed == 1
+    assert 'New text' in (output / 'index.html').read_text(encoding='utf-8')
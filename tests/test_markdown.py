@@ -0,0 +1,78 @@
+"""Markdown to HTML rendering"""
+
+import pytest
+
+from web_builder import MarkdownRenderer
+
+DOCUMENT = """# Title #
+
+Setext
+------
+
+Some *em*, **strong** and `code <b>` text.
+Line with break  
+next <script>
+
+- one
+- two
+  1. nested
+  2. items
+- three
+
+> quote **bold**
+
+```python
+x = 1 < 2
+```
+
+***
+"""
+
+
+@pytest.fixture
+def renderer():
+    return MarkdownRenderer()
+
+
+def test_blocks(renderer):
+    html = renderer.render(DOCUMENT)
+
+    assert html.startswith('<h1>Title</h1>\n<h2>Setext</h2>\n')
+    assert '<p>Some <em>em</em>, <strong>strong</strong> and <code>code &lt;b&gt;</code> text.' in html
+    assert 'Line with break<br>\nnext &lt;script&gt;</p>' in html
+    assert html.count('<ul>') == 1 and html.count('<ol>') == 1 and html.count('<li>') == 5
+    assert '<blockquote>\n<p>quote <strong>bold</strong></p>\n</blockquote>' in html
+    assert '<pre><code class="language-python">x = 1 &lt; 2\n</code></pre>' in html
+    assert html.endswith('<hr>')
+
+
+def test_streamed_lines_render_the_same(renderer):
+    fragments = list(renderer.iter_render(DOCUMENT.splitlines(keepends=True)))
+
+    assert len(fragments) > 1
+    assert '\n'.join(fragments) == renderer.render(DOCUMENT)
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('[x](http://x.com/a_(b))', '<a href="http://x.com/a_(b)">x</a>'),
+    ('see ([x](http://x.com)) now', 'see (<a href="http://x.com">x</a>) now'),
+    ('[x](/a "T")', '<a href="/a" title="T">x</a>'),
+    ('![alt](img_(1).png)', '<img src="img_(1).png" alt="alt">'),
+    ('<https://x.com/?a=1&b=2>', '<a href="https://x.com/?a=1&amp;b=2">https://x.com/?a=1&amp;b=2</a>'),
+    ('[x](javascript:alert(1))', '<a href="#">x</a>'),
+    ('![x](data:text/html,x)', '<img src="#" alt="x">'),
+])
+def test_links_and_images(renderer, text, expected):
+    assert renderer.inline(text) == expected
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('2*3*4', '2<em>3</em>4'),
+    ('snake_case_name', 'snake_case_name'),
+    (r'\*not em\*', '*not em*'),
+    ('**bold *em* x**', '<strong>bold <em>em</em> x</strong>'),
+    ('`a*b*c`', '<code>a*b*c</code>'),
+    ('a < b & c', 'a &lt; b &amp; c'),
+])
+def test_emphasis_code_and_escaping(renderer, text, expected):
+    assert renderer.inline(text) == expected
@@ -0,0 +1,64 @@
+"""CSS and HTML minification"""
+
+import random
+
+from web_builder import PAGE_CSS, HtmlMinifier, minify_css
+
+
+def minify_html(html, sizes):
+    minifier = HtmlMinifier()
+    out, start = [], 0
+    for size in sizes:
+        out.append(minifier.feed(html[start:start + size]))
+        start += size
+    out.append(minifier.feed(html[start:]))
+    return ''.join(out) + minifier.close()
+
+
+def test_css_whitespace_around_punctuation_is_removed():
+    css = '/* note */ a , b  {\n  color : red ;\n  margin : 0 auto ;\n}\n'
+
+    assert minify_css(css) == 'a,b{color:red;margin:0 auto}'
+
+
+def test_css_selector_colons_keep_their_space():
+    assert minify_css('.a :hover { color: red; }') == '.a :hover{color:red}'
+    assert minify_css('.a:hover, .b ::before { x: y }') == '.a:hover,.b ::before{x:y}'
+
+
+def test_css_operators_and_strings_are_kept():
+    css = 'p { width: calc(100% - (2 * 3px + 1px)); content: "a ; b { , }"; }\nli + li , a > b { top: 0 }'
+
+    assert minify_css(css) == ('p{width:calc(100% - (2 * 3px + 1px));content:"a ; b { , }"}'
+                               'li + li,a > b{top:0}')
+
+
+def test_css_at_rule_preludes_are_kept():
+    css = '@media (min-width: 600px) and (max-width: 900px) { .a { width : 50% } }'
+
+    assert minify_css(css) == '@media (min-width: 600px) and (max-width: 900px){.a{width:50%}}'
+
+
+def test_page_css_only_gets_shorter():
+    minified = minify_css(PAGE_CSS)
+
+    assert len(minified) < len(PAGE_CSS)
+    assert minified.count('{') == PAGE_CSS.count('{')
+    assert '/*' not in minified
+
+
+def test_html_result_does_not_depend_on_chunking():
+    html = ('<!DOCTYPE html>\n<html>\n  <head>\n    <style>\n      .a :hover { color : red ; }\n    </style>\n'
+            '  </head>\n  <body>\n    <!-- comment -->\n    <p>Some   <em>inline</em>  text</p>\n'
+            '    <pre>  keep\n    this  </pre>\n    <p>a  b</p>\n  </body>\n</html>\n')
+    expected = minify_html(html, [])
+    rng = random.Random(0)
+
+    for _ in range(50):
+        assert minify_html(html, [rng.randint(1, 8) for _ in range(len(html))]) == expected
+
+    assert '<style>.a :hover{color:red}</style>' in expected
+    assert '<p>Some <em>inline</em> text</p>' in expected
+    assert '<pre>  keep\n    this  </pre>' in expected
+    assert '<p>a  b</p>' in expected
+    assert '<!--' not in expected
@@ -0,0 +1,65 @@
+"""Asyncio OCR -> Markdown -> ERNIE pipeline"""
+
+import asyncio
+import shutil
+from pathlib import Path
+
+import pytest
+
+from web_builder import AsyncPDFToWebPageConverter
+
+SAMPLE_PDF = Path(__file__).resolve().parent.parent / 'sample_ai_document.pdf'
+
+
+@pytest.fixture
+def jobs(tmp_path):
+    pytest.importorskip('pdfplumber')
+    jobs = []
+    for index in range(6):
+        pdf_path = tmp_path / f"doc{index}.pdf"
+        shutil.copy(SAMPLE_PDF, pdf_path)
+        jobs.append((pdf_path, tmp_path / 'site' / f"doc{index}"))
+    return jobs
+
+
+def run(converter, jobs, **options):
+    return asyncio.run(asyncio.wait_for(converter.run_pipeline(jobs, **options), timeout=60))
+
+
+def test_pipeline_converts_every_document(tmp_path, jobs):
+    converter = AsyncPDFToWebPageConverter(output_dir=str(tmp_path / 'site'), offline=True)
+    reported = []
+
+    results = run(converter, jobs, ocr_workers=2, ernie_workers=2, queue_size=1, on_result=reported.append)
+
+    assert sorted(result['pdf'] for result in results) == sorted(str(pdf) for pdf, _ in jobs)
+    assert all(result['status'] == 'ok' for result in results)
+    assert reported == results
+    assert all((output / 'index.html').exists() for _, output in jobs)
+
+
+def test_failing_callback_is_raised_without_blocking(tmp_path, jobs):
+    converter = AsyncPDFToWebPageConverter(output_dir=str(tmp_path / 'site'), offline=True)
+    calls = []
+
+    def on_result(result):
+        calls.append(result)
+        raise ValueError('report failed')
+
+    with pytest.raises(ValueError, match='report failed'):
+        run(converter, jobs, ocr_workers=1, ernie_workers=1, queue_size=1, on_result=on_result)
+
+    assert len(calls) == 1
+
+
+def test_failing_callback_for_a_failed_document_is_raised(tmp_path):
+    broken = tmp_path / 'broken.pdf'
+    broken.write_bytes(b'not a pdf')
+    converter = AsyncPDFToWebPageConverter(output_dir=str(tmp_path / 'site'), offline=True)
+    converter.converter.demo_fallback = False
+
+    def on_result(result):
+        raise ValueError(result['status'])
+
+    with pytest.raises(ValueError, match='failed'):
+        run(converter, [(broken, tmp_path / 'site' / 'broken')] * 3, queue_size=1, on_result=on_result)
@@ -0,0 +1,141 @@
+"""Local HTTP conversion service"""
+
+import json
+import threading
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+from web_builder import ConversionService, PDFToWebPageConverter
+
+SAMPLE_PDF = Path(__file__).resolve().parent.parent / 'sample_ai_document.pdf'
+
+
+def request(url, data=None):
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=data), timeout=30) as response:
+            return response.status, dict(response.headers), response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, dict(e.headers), e.read()
+
+
+@pytest.fixture
+def converter(tmp_path):
+    return PDFToWebPageConverter(output_dir=str(tmp_path / 'service'), offline=True)
+
+
+@pytest.fixture
+def pdf():
+    pytest.importorskip('pdfplumber')
+    return SAMPLE_PDF.read_bytes()
+
+
+def test_sync_conversion_returns_markdown_and_html(converter, pdf):
+    with ConversionService(converter, port=0, workers=1, max_queue=1) as service:
+        status, _, body = request(service.url + '/convert', pdf)
+        status_md, headers, markdown = request(service.url + '/convert?format=markdown', pdf)
+
+    result = json.loads(body)
+    assert status == 200 and result['status'] == 'done'
+    assert result['html'].startswith('<!DOCTYPE html>')
+    assert '(cid:' not in result['markdown']
+    assert status_md == 200 and headers['Content-Type'].startswith('text/markdown')
+    assert markdown.decode('utf-8') == result['markdown']
+
+
+def test_async_conversion_can_be_polled(converter, pdf):
+    with ConversionService(converter, port=0, workers=1, max_queue=1) as service:
+        status, headers, body = request(service.url + '/convert?async=1', pdf)
+        job = json.loads(body)
+        assert status == 202 and headers['Location'] == f"/jobs/{job['job']}"
+        service.jobs[job['job']]['future'].result()
+
+        job = json.loads(request(service.url + headers['Location'])[2])
+        page = request(service.url + job['html_url'])
+
+    assert job['status'] == 'done'
+    assert page[0] == 200 and page[2].startswith(b'<!DOCTYPE html>')
+
+
+def test_uploads_that_are_not_pdfs_are_rejected(converter):
+    with ConversionService(converter, port=0, workers=1, max_queue=1) as service:
+        assert request(service.url + '/convert', b'not a pdf')[0] == 415
+        assert request(service.url + '/convert', b'%PD')[0] == 415
+        assert service.jobs == {}
+
+
+def test_pdf_without_content_fails_instead_of_demo_page(converter):
+    pytest.importorskip('pdfplumber')
+    with ConversionService(converter, port=0, workers=1, max_queue=1) as service:
+        status, _, body = request(service.url + '/convert', b'%PDF-1.4 broken')
+
+    result = json.loads(body)
+    assert status == 422
+    assert result['status'] == 'failed' and 'ExtractionError' in result['error']
+    assert 'html' not in result
+
+
+def test_full_queue_sheds_load(converter, pdf):
+    release = threading.Event()
+    process = converter.process
+    converter.process = lambda *args, **kwargs: release.wait(10) and process(*args, **kwargs)
+
+    with ConversionService(converter, port=0, workers=1, max_queue=1, retry_after=7) as service:
+        accepted = [request(service.url + '/convert?async=1', pdf)[0] for _ in range(2)]
+        status, headers, _ = request(service.url + '/convert?async=1', pdf)
+        health = json.loads(request(service.url + '/health')[2])
+        release.set()
+
+    assert accepted == [202, 202]
+    assert status == 503 and headers['Retry-After'] == '7'
+    assert health['capacity'] == 2 and health['running'] + health['queued'] == 2
+
+
+def test_expiry_keeps_output_of_waiting_requests(converter, pdf):
+    with ConversionService(converter, port=0, workers=4, max_queue=4, max_jobs=0) as service:
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(request(service.url + '/convert', pdf)[0]))
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == [200] * 4
+        assert service.jobs == {}
+        assert list(service.jobs_dir.iterdir()) == []
+
+
+def test_jobs_of_earlier_runs_are_removed(converter, pdf):
+    for _ in range(2):
+        with ConversionService(converter, port=0, workers=1, max_queue=1) as service:
+            assert request(service.url + '/convert', pdf)[0] == 200
+    (service.jobs_dir / 'keep-me').mkdir()
+
+    with ConversionService(converter, port=0, workers=1, max_queue=1) as service:
+        assert [path.name for path in service.jobs_dir.iterdir()] == ['keep-me']
+
+
+def test_failed_submission_forgets_the_job(converter, pdf):
+    service = ConversionService(converter, port=0, workers=1, max_queue=1)
+    service._pool.shutdown()
+    try:
+        with pytest.raises(RuntimeError):
+            service.submit(lambda path: path.write_bytes(pdf))
+        assert service.jobs == {}
+        assert list(service.jobs_dir.iterdir()) == []
+        assert service._slots.acquire(blocking=False)
+    finally:
+        service.httpd.server_close()
+
+
+def test_metrics_count_requests(converter):
+    with ConversionService(converter, port=0, workers=1, max_queue=1) as service:
+        request(service.url + '/convert', b'not a pdf')
+        request(service.url + '/jobs/0123456789abcdef')
+        metrics = request(service.url + '/metrics')[2].decode('utf-8')
+
+    assert 'warmup_service_requests_total{route="convert",status="415"} 1' in metrics
+    assert 'warmup_service_requests_total{route="jobs",status="404"} 1' in metrics
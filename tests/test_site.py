@@ -0,0 +1,96 @@
+"""Multi-document site listing and search index"""
+
+import json
+
+import pytest
+
+from web_builder import PDFToWebPageConverter, SearchIndex, fnv1a_32
+
+
+def write_document(root, slug, markdown):
+    (root / slug).mkdir(parents=True, exist_ok=True)
+    (root / slug / 'content.md').write_text(markdown, encoding='utf-8')
+
+
+@pytest.fixture
+def site(tmp_path):
+    root = tmp_path / 'site'
+    write_document(root, 'alpha', '# Alpha Report\n\nNeural networks and the transformer.\n')
+    write_document(root, 'beta', '# Beta Notes\n\nTransformer models, transformer training.\n')
+    write_document(root, 'gamma', '# 语言模型\n\n中文 text.\n')
+    return root
+
+
+def lookup(root, term):
+    """Postings of a term and the documents they point to, read the way SEARCH_JS does"""
+    directory = root / SearchIndex.DIRECTORY
+    manifest = json.loads((directory / 'index.json').read_text(encoding='utf-8'))
+    shard = manifest['shards'][fnv1a_32(term) % len(manifest['shards'])]
+    postings = json.loads((directory / shard).read_text(encoding='utf-8')).get(term, [])
+    documents = []
+    for doc in postings[::2]:
+        doc_shard = manifest['document_shards'][doc // manifest['documents_per_shard']]
+        documents.append(json.loads((directory / doc_shard).read_text(encoding='utf-8'))[doc])
+    return postings[1::2], [doc['title'] for doc in documents]
+
+
+def test_tokenize_drops_stopwords_and_splits_cjk():
+    assert SearchIndex.tokenize('The Transformer is a model of 语言') == ['transformer', 'model', '语', '言']
+
+
+@pytest.mark.parametrize('shard_bytes', [64 * 1024, 16])
+def test_terms_are_found_in_their_shard(site, shard_bytes):
+    index = SearchIndex(site, shard_bytes=shard_bytes)
+    documents = index.update()
+    index.save()
+
+    assert [doc['title'] for doc in documents] == ['Alpha Report', 'Beta Notes', '语言模型']
+    assert lookup(site, 'transformer') == ([1, 2], ['Alpha Report', 'Beta Notes'])
+    assert lookup(site, '语') == ([1], ['语言模型'])
+    assert lookup(site, 'missing') == ([], [])
+
+
+def test_only_changed_documents_are_indexed_again(site):
+    index = SearchIndex(site)
+    index.update()
+    index.save()
+    files = set((site / SearchIndex.DIRECTORY).iterdir())
+
+    index = SearchIndex(site)
+    index.update()
+    assert index.tokenized == 0
+    assert set(index.save()) == files
+
+    write_document(site, 'beta', '# Beta Notes\n\nAttention only.\n')
+    index = SearchIndex(site)
+    index.update()
+    index.save()
+
+    assert index.tokenized == 1
+    assert lookup(site, 'transformer') == ([1], ['Alpha Report'])
+    assert lookup(site, 'attention') == ([1], ['Beta Notes'])
+    assert len(set((site / SearchIndex.DIRECTORY).iterdir()) - files) > 0
+
+
+def test_removed_documents_free_their_id(site):
+    index = SearchIndex(site)
+    index.update()
+    index.save()
+    (site / 'alpha' / 'content.md').unlink()
+    write_document(site, 'delta', '# Delta\n\nTransformer again.\n')
+
+    index = SearchIndex(site)
+    documents = index.update()
+    index.save()
+
+    assert {doc['title']: doc['id'] for doc in documents} == {'Beta Notes': 1, 'Delta': 0, '语言模型': 2}
+    assert lookup(site, 'transformer') == ([1, 2], ['Delta', 'Beta Notes'])
+
+
+def test_listing_page_links_every_document(site):
+    page = PDFToWebPageConverter(output_dir=str(site), offline=True).build_site()
+    html = page.read_text(encoding='utf-8')
+
+    assert '3 documents' in html
+    assert '<a href="alpha/index.html">Alpha Report</a>' in html
+    assert 'data-index="search/"' in html
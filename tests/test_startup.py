@@ -0,0 +1,20 @@
+"""Cold-start budget of the command line (opt-in: wall-clock timing of subprocesses)"""
+
+import os
+
+import pytest
+
+from benchmark import bench_startup
+
+# Median overhead of an offline CLI run over a bare interpreter, in milliseconds.
+# It is about 50 ms on a developer machine; set STARTUP_BUDGET_MS to run the check
+BUDGET_MS = os.getenv('STARTUP_BUDGET_MS')
+
+
+@pytest.mark.skipif(not BUDGET_MS, reason="set STARTUP_BUDGET_MS to check the start-up budget")
+def test_offline_startup_within_budget():
+    budget_ms = float(BUDGET_MS)
+    report = bench_startup(repeat=5, budget_ms=budget_ms)
+
+    assert report['heavy_modules_loaded'] == []
+    assert report['cli_overhead_ms'] <= budget_ms, report
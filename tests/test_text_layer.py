@@ -0,0 +1,63 @@
+"""Text-layer extraction of born-digital PDFs"""
+
+import pytest
+
+pytest.importorskip('pdfplumber')
+pytest.importorskip('reportlab')
+
+from create_sample_pdf import create_ai_language_models_pdf, create_synthetic_pdf
+from web_builder import PDFToWebPageConverter
+
+
+@pytest.fixture
+def converter(tmp_path):
+    return PDFToWebPageConverter(output_dir=str(tmp_path / 'output'), offline=True)
+
+
+def blocks_of(converter, pdf_path):
+    layout_by_page, scanned, _ = converter._extract_text_layer(str(pdf_path))
+    assert not scanned
+    return [block for page in sorted(layout_by_page) for block in layout_by_page[page]]
+
+
+def test_unmapped_bullet_glyphs_become_list_items(converter, tmp_path):
+    blocks = blocks_of(converter, create_ai_language_models_pdf(str(tmp_path / 'sample.pdf')))
+
+    assert not any('(cid:' in block['text'] for block in blocks)
+    items = [block['text'] for block in blocks if block['type'] == 'list_item']
+    assert len(items) == 6
+    assert items[0].startswith('Document Understanding:')
+
+
+def test_synthetic_bullets_become_list_items(converter, tmp_path):
+    pdf_path = create_synthetic_pdf(str(tmp_path / 'synthetic.pdf'), pages=2, sections_per_page=2,
+                                    list_items=3)
+    blocks = blocks_of(converter, pdf_path)
+
+    assert not any('(cid:' in block['text'] for block in blocks)
+    assert sum(block['type'] == 'list_item' for block in blocks) == 12
+
+
+def test_markdown_renders_bullets_as_list(converter, tmp_path):
+    pdf_path = create_ai_language_models_pdf(str(tmp_path / 'sample.pdf'))
+    markdown = converter.convert_to_markdown(converter.extract_text_from_pdf_with_paddleocr(pdf_path))
+
+    assert '(cid:' not in markdown
+    assert '- Document Understanding:' in markdown
+
+
+def classify(converter, *texts):
+    lines = [{'text': text, 'size': 10.0, 'bold': False, 'bbox': (72, 100 + 40 * index, 300, 110 + 40 * index)}
+             for index, text in enumerate(texts)]
+    return [(block['type'], block['text']) for block in converter._classify_text_lines(lines, 10.0, 0)]
+
+
+def test_only_the_bullet_prefix_is_removed(converter):
+    assert classify(converter, '- -1 is negative', '• * starred', '•Tight', '* item') == [
+        ('list_item', '-1 is negative'), ('list_item', '* starred'), ('list_item', 'Tight'), ('list_item', 'item')]
+
+
+def test_dashes_and_numbers_at_line_start_stay_paragraphs(converter):
+    assert classify(converter, '–10 °C at night', '– an aside', '-1 is negative', '*emphasis*') == [
+        ('paragraph', '–10 °C at night'), ('paragraph', '– an aside'), ('paragraph', '-1 is negative'),
+        ('paragraph', '*emphasis*')]
@@ -0,0 +1,108 @@
+"""Pooled Baidu transport, retries and client-side rate limiting"""
+
+import socket
+import time
+
+import pytest
+
+pytest.importorskip('requests')
+
+from benchmark import MockBaiduServer
+from web_builder import OCR_PATH, AdaptiveConcurrency, BaiduTransport, EndpointLimiter, Metrics, TokenBucket
+
+UNLIMITED = {'ocr': {}}
+
+
+def transport(**options):
+    return BaiduTransport(backoff_base=0.001, backoff_max=0.01, rate_limits=UNLIMITED, **options)
+
+
+def test_server_errors_are_retried_until_success():
+    with MockBaiduServer(error_rate=0.5, seed=3) as server:
+        response = transport(max_retries=10).post(server.url + OCR_PATH, endpoint='ocr', data={'pdf_file': ''})
+
+    assert response.status_code == 200
+    assert server.stats['ocr']['errors'] >= 1
+    assert server.stats['ocr']['requests'] == server.stats['ocr']['errors'] + 1
+
+
+def test_last_response_is_returned_when_retries_run_out():
+    metrics = Metrics()
+    with MockBaiduServer(error_rate=1.0) as server:
+        response = transport(max_retries=2, metrics=metrics).post(server.url + OCR_PATH, endpoint='ocr')
+
+    assert response.status_code == 503
+    assert server.stats['ocr']['requests'] == 3
+    assert 'warmup_http_retries_total{endpoint="ocr",reason="503"} 2' in metrics.prometheus_text()
+
+
+def test_throttling_error_codes_are_retried():
+    with MockBaiduServer(throttle_rate=1.0) as server:
+        response = transport(max_retries=1).post(server.url + OCR_PATH, endpoint='ocr')
+
+    assert response.json()['error_code'] == 18
+    assert server.stats['ocr']['requests'] == 2
+
+
+def test_connection_errors_are_raised_after_retries():
+    import requests
+
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+
+    with pytest.raises(requests.ConnectionError):
+        transport(max_retries=1).post(f"http://127.0.0.1:{port}{OCR_PATH}", endpoint='ocr')
+
+
+
+def test_token_bucket_limits_the_rate():
+    bucket = TokenBucket(rate=100.0, capacity=1)
+    start = time.monotonic()
+    waited = sum(bucket.acquire() for _ in range(6))
+
+    assert time.monotonic() - start >= 0.04
+    assert waited >= 0.04
+
+
+def test_oversized_requests_leave_the_bucket_in_debt():
+    bucket = TokenBucket(rate=1000.0, capacity=10)
+
+    assert bucket.acquire(30) == 0.0
+    assert bucket.acquire(1) >= 0.015
+
+
+def test_concurrency_halves_on_throttling_and_grows_back():
+    concurrency = AdaptiveConcurrency(initial=8, cooldown=60)
+    for throttled in (True, True):
+        concurrency.acquire()
+        concurrency.release(throttled=throttled)
+
+    assert concurrency.limit == 4  # the second throttle is inside the cooldown
+
+    for _ in range(4):
+        concurrency.acquire()
+        concurrency.release()
+    assert 4 < concurrency.limit < 5  # about one more slot per window of healthy responses
+
+
+def test_limiter_frees_its_slot_when_waiting_fails():
+    limiter = EndpointLimiter(tokens_per_minute=60, initial_concurrency=1)
+
+    def interrupted(amount):
+        raise KeyboardInterrupt
+
+    limiter.tokens.acquire = interrupted
+
+    with pytest.raises(KeyboardInterrupt):
+        limiter.acquire(tokens=10)
+    assert limiter.concurrency.in_flight == 0
+
+
+def test_throttled_responses_reduce_concurrency():
+    client = BaiduTransport(backoff_base=0.001, backoff_max=0.01, max_retries=1,
+                            rate_limits={'ocr': {'initial_concurrency': 8}})
+    with MockBaiduServer(throttle_rate=1.0) as server:
+        client.post(server.url + OCR_PATH, endpoint='ocr')
+
+    assert client.limiters['ocr'].concurrency.limit == 4
@@ -0,0 +1,101 @@
+"""Watch mode"""
+
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from web_builder import DirectoryWatcher, PDFToWebPageConverter
+
+SAMPLE_PDF = Path(__file__).resolve().parent.parent / 'sample_ai_document.pdf'
+
+
+@pytest.fixture
+def inbox(tmp_path):
+    path = tmp_path / 'inbox'
+    path.mkdir()
+    return path
+
+
+def make_watcher(tmp_path, inbox, **options):
+    converter = PDFToWebPageConverter(output_dir=str(tmp_path / 'site'), offline=True)
+    return DirectoryWatcher(converter, [str(inbox)], output_root=str(tmp_path / 'site'), debounce=0, **options)
+
+
+def settle(watcher):
+    """Poll until every file is past the debounce check (first poll only registers it)"""
+    watcher.poll()
+    return watcher.poll()
+
+
+def test_converts_new_file_once(tmp_path, inbox):
+    pytest.importorskip('pdfplumber')
+    shutil.copy(SAMPLE_PDF, inbox / 'a.pdf')
+    watcher = make_watcher(tmp_path, inbox)
+
+    results = settle(watcher)
+
+    assert [result['status'] for result in results] == ['ok']
+    assert (tmp_path / 'site' / 'a' / 'index.html').exists()
+    assert settle(watcher) == []
+
+
+def test_touching_a_file_does_not_convert_it_again(tmp_path, inbox):
+    pytest.importorskip('pdfplumber')
+    pdf_path = inbox / 'a.pdf'
+    shutil.copy(SAMPLE_PDF, pdf_path)
+    watcher = make_watcher(tmp_path, inbox)
+    settle(watcher)
+
+    stat = pdf_path.stat()
+    os.utime(pdf_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    assert settle(watcher) == []
+
+
+def test_restarted_watcher_skips_unchanged_files(tmp_path, inbox):
+    pytest.importorskip('pdfplumber')
+    shutil.copy(SAMPLE_PDF, inbox / 'a.pdf')
+    settle(make_watcher(tmp_path, inbox))
+
+    assert settle(make_watcher(tmp_path, inbox)) == []
+
+
+def test_broken_pdf_fails_and_is_not_published(tmp_path, inbox):
+    (inbox / 'broken.pdf').write_bytes(b'%PDF-1.4 broken')
+    watcher = make_watcher(tmp_path, inbox, site=True)
+
+    results = settle(watcher)
+
+    assert [result['status'] for result in results] == ['failed']
+    assert 'ExtractionError' in results[0]['error']
+    assert watcher.documents == {}
+    assert not (tmp_path / 'site' / 'broken' / 'content.md').exists()
+    assert '0 documents' in (tmp_path / 'site' / 'index.html').read_text(encoding='utf-8')
+
+
+def test_failed_conversion_is_retried(tmp_path, inbox):
+    pytest.importorskip('pdfplumber')
+    pdf_path = inbox / 'a.pdf'
+    shutil.copy(SAMPLE_PDF, pdf_path)
+    watcher = make_watcher(tmp_path, inbox)
+    process = watcher.converter.process
+    calls = []
+
+    def flaky(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 1:
+            raise RuntimeError('temporarily unavailable')
+        return process(*args, **kwargs)
+
+    watcher.converter.process = flaky
+    assert [result['status'] for result in settle(watcher)] == ['failed']
+    assert settle(watcher) == []  # backing off
+
+    signature, attempts, _ = watcher._failed[str(pdf_path)]
+    watcher._failed[str(pdf_path)] = (signature, attempts, 0.0)  # backoff elapsed
+
+    assert [result['status'] for result in settle(watcher)] == ['ok']
+    assert len(calls) == 2
+    assert str(pdf_path) in watcher.documents